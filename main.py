@@ -1,59 +1,276 @@
 import os
+import re
+import time
 import asyncio
-import aiohttp
-from typing import List, Dict, Any
+import yaml
+from collections import deque
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlparse
 from dotenv import load_dotenv
+from tools.http_transport import CassetteMiss, get_transport
+from tools.loop_monitor import monitor_loop
+from tools.competitor_cache import CompetitorCache, content_fingerprint
+from tools.semantic_cache import SemanticCache
+from tools.deadline import DeadlineExceeded, check_deadline, deadline_scope
 
 # Load environment variables
 load_dotenv()
 
+# Review sites, listicles and social platforms that rank well for
+# "alternatives" queries but are not products themselves
+AGGREGATOR_DOMAINS = {
+    "g2.com", "capterra.com", "getapp.com", "softwareadvice.com",
+    "trustradius.com", "producthunt.com", "alternativeto.net", "slant.co",
+    "sourceforge.net", "gartner.com", "wikipedia.org", "reddit.com",
+    "quora.com", "medium.com", "youtube.com", "forbes.com", "techradar.com",
+    "pcmag.com", "zdnet.com", "techcrunch.com", "zapier.com", "linkedin.com",
+}
+
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "profiles")
+
+# Query variants sent concurrently when no competitors are named
+DISCOVERY_QUERIES = [
+    "{category} competitors alternatives",
+    "best {category} products",
+    "{category} software official site",
+    "leading {category} platforms",
+]
+
+def _domain(url: str) -> str:
+    """Registrable host of a URL without the www. prefix"""
+    host = urlparse(url).netloc.lower().split(":")[0]
+    return host[4:] if host.startswith("www.") else host
+
+def _is_aggregator(url: str) -> bool:
+    """True if the URL belongs to a review site or content aggregator"""
+    domain = _domain(url)
+    return any(domain == d or domain.endswith("." + d) for d in AGGREGATOR_DOMAINS)
+
+def _product_url(url: str) -> str:
+    """Product page URL with query string and fragment removed"""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}{parsed.path.rstrip('/')}"
+
+def _name_match(name: str, result: Dict) -> int:
+    """How many words of a product name appear as whole words in a result's domain, path or title"""
+    parsed = urlparse(result.get("url", ""))
+    haystack = set(re.findall(r"[a-z0-9]+", f"{parsed.netloc} {parsed.path} {result.get('title', '')}".lower()))
+    return sum(word in haystack for word in re.findall(r"[a-z0-9]+", name.lower()))
+
+def _unavailable(text: str) -> bool:
+    """True for the placeholder returned when an LLM call failed"""
+    return text.startswith("Analysis unavailable")
+
+def _product_name(title: str, url: str) -> str:
+    """Best-effort product name from a page title, falling back to the domain"""
+    for separator in (" | ", " · ", " - ", " – ", " — ", ": "):
+        title = title.split(separator)[0]
+    title = title.strip()
+    return title or _domain(url).split(".")[0].capitalize()
+
 class ProductAnalysisAgent:
     """
     Specialized agent for competitive product analysis using ROMA framework.
     Implements the complete "Launch Product Analysis" workflow.
     """
     
-    def __init__(self):
+    def __init__(self, profile: str = "product_analysis"):
         self.openrouter_key = os.getenv("OPENROUTER_API_KEY")
         self.exa_key = os.getenv("EXA_API_KEY")
         self.model = os.getenv("OPENROUTER_MODEL", "openrouter/z-ai/glm-4.5-air:free")
+        self.max_competitors = int(os.getenv("MAX_COMPETITORS", "5"))
+        self.profile = self._load_profile(profile)
+        self.request_timeout = self.profile.get("performance", {}).get("request_timeout")
+        self.competitor_cache = CompetitorCache.from_profile(self.profile)
+        self.semantic_cache = SemanticCache.from_profile(self.profile)
+        self._resolved: Dict[str, asyncio.Task] = {}
+        self._latencies: Dict[tuple, deque] = {}
+    
+    @staticmethod
+    def _load_profile(name: str) -> Dict[str, Any]:
+        """Load a ROMA profile from config/profiles, empty if it doesn't exist"""
+        path = os.path.join(PROFILES_DIR, f"{name}.yaml")
+        if not os.path.exists(path):
+            print(f"⚠️ Profile not found: {path}, using defaults")
+            return {}
+        with open(path) as f:
+            return yaml.safe_load(f) or {}
+    
+    def _route(self, stage: str) -> Dict[str, Any]:
+        """Resolve model, temperature and token limit for a pipeline stage ("extraction.pricing" falls back to "extraction")"""
+        stages = self.profile.get("routing", {}).get("stages", {})
+        stage_config = stages.get(stage, stages.get(stage.split(".")[0], {}))
+        agent = self.profile.get("agents", {}).get(stage_config.get("agent", "executor"), {})
+        llm = agent.get("llm", {})
         
-    async def analyze_competitors(self, product_category: str, competitors: List[str] = None) -> Dict[str, Any]:
+        return {
+            "stage": stage,
+            "model": stage_config.get("model", llm.get("model", self.model)),
+            "temperature": stage_config.get("temperature", llm.get("temperature")),
+            "max_tokens": stage_config.get("max_tokens", llm.get("max_tokens", 4000))
+        }
+    
+    def _hedge_delay(self, stage: str, model: str) -> float:
+        """Seconds to wait on a model before hedging, from its observed latency percentile for this stage"""
+        hedging = self.profile.get("routing", {}).get("hedging", {})
+        samples = sorted(self._latencies.get((stage, model), ()))
+        if len(samples) < hedging.get("min_samples", 20):
+            return hedging.get("initial_delay", 10.0)
+        index = min(len(samples) - 1, int(len(samples) * hedging.get("percentile", 95) / 100))
+        return samples[index]
+        
+    async def analyze_competitors(self, product_category: str, competitors: List[str] = None,
+                                  *, timeout: Optional[float] = None) -> Dict[str, Any]:
         """
         Complete competitive analysis workflow:
         1. Search competitor products
         2. Analyze websites and features
         3. Create comparison framework
         4. Generate comprehensive report
+        
+        The whole run is bounded by `timeout` seconds (default: runtime.timeout
+        from the profile). If the deadline is reached, the report is returned
+        with `partial` set and the missing competitors and sections listed.
         """
         print(f"🚀 Starting competitive analysis for: {product_category}")
         
-        # Step 1: Search for competitors
-        competitor_data = await self._search_competitors(product_category, competitors)
+        runtime = self.profile.get("runtime", {})
+        budget = timeout if timeout is not None else runtime.get("timeout")
+        missing = {"competitors": [], "sections": []}
+        
+        # Per-run event-loop diagnostics (loop lag and blocking calls)
+        monitor_config = self.profile.get("performance", {}).get("loop_monitor", {})
+        async with monitor_loop(f"analyze_competitors({product_category})", monitor_config) as loop_session:
+            with deadline_scope(budget) as deadline:
+                # Step 1: Search for competitors
+                try:
+                    competitor_data = await self._search_competitors(product_category, competitors, missing)
+                except DeadlineExceeded:
+                    print("⏱️ Deadline reached while searching competitors")
+                    competitor_data = []
+                    missing["sections"].append("competitor_search")
+                else:
+                    if not competitors and not competitor_data:
+                        missing["sections"].append("competitor_search")
+                
+                # Step 2: Analyze each competitor, keeping time back for the report
+                analysis_budget = None
+                if deadline:
+                    remaining = deadline.remaining()
+                    analysis_budget = remaining - min(runtime.get("aggregation_reserve", 0), remaining / 2)
+                analysis_results = []
+                with deadline_scope(analysis_budget):
+                    for competitor in competitor_data:
+                        try:
+                            analysis = await self._analyze_competitor(competitor)
+                        except DeadlineExceeded:
+                            print(f"⏱️ Deadline reached, skipping: {competitor['name']}")
+                            missing["competitors"].append(competitor["name"])
+                            continue
+                        if _unavailable(analysis["website_analysis"]):
+                            # Nothing to compare without the website analysis
+                            print(f"⚠️ Analysis failed, skipping: {competitor['name']}")
+                            missing["competitors"].append(competitor["name"])
+                            continue
+                        analysis_results.append(analysis)
+                
+                # Step 3: Generate comparison report
+                final_report = await self._generate_comparison_report(product_category, analysis_results, missing)
         
-        # Step 2: Analyze each competitor
-        analysis_results = []
-        for competitor in competitor_data:
-            analysis = await self._analyze_competitor(competitor)
-            analysis_results.append(analysis)
+        diagnostics = loop_session.report() if loop_session else None
         
-        # Step 3: Generate comparison report
-        final_report = await self._generate_comparison_report(product_category, analysis_results)
+        final_report["deadline_seconds"] = budget
+        final_report["partial"] = bool(missing["competitors"] or missing["sections"])
+        final_report["missing"] = missing
+        
+        if diagnostics:
+            final_report["loop_diagnostics"] = diagnostics
+            for entry in diagnostics["blocking_calls"][:3]:
+                print(f"🐢 Loop blocked by {entry['function']}: "
+                      f"{entry['count']}x, {entry['total_seconds']}s total, {entry['max_seconds']}s max")
         
         return final_report
     
-    async def _search_competitors(self, category: str, competitors: List[str] = None) -> List[Dict]:
+    async def _search_competitors(self, category: str, competitors: List[str] = None,
+                                  missing: Dict[str, List[str]] = None) -> List[Dict]:
         """Executor: Search for competitor products using Exa"""
         print(f"🔍 Searching competitors for: {category}")
         
-        # Use Exa search to find relevant products
-        search_results = await self._exa_search(f"{category} competitors alternatives")
+        if competitors:
+            # Named competitors only need their product URL resolved
+            resolved = await asyncio.gather(*[
+                self._resolve_competitor(name, category) for name in competitors
+            ])
+            unresolved = [competitor["name"] for competitor in resolved if not competitor["url"]]
+            if unresolved and missing is not None:
+                missing["competitors"].extend(unresolved)
+            return [competitor for competitor in resolved if competitor["url"]]
+        
+        return await self._discover_competitors(category)
+    
+    async def _resolve_competitor(self, name: str, category: str) -> Dict:
+        """Tool: Resolve a named competitor to its canonical product URL"""
+        key = name.strip().lower()
+        if key not in self._resolved:
+            # Cache the task itself so concurrent callers share one lookup
+            self._resolved[key] = asyncio.ensure_future(self._lookup_product_url(name))
+        try:
+            url, description = await self._resolved[key]
+        except Exception:
+            # Don't cache failed lookups
+            self._resolved.pop(key, None)
+            raise
+        if not url:
+            # Nor empty ones, which may come from a transient search error
+            self._resolved.pop(key, None)
         
+        return {
+            "name": name,
+            "url": url,
+            "description": description,
+            "category": category
+        }
+    
+    async def _lookup_product_url(self, name: str) -> tuple:
+        """Find the product page for a name, preferring results whose domain, path or title match it"""
+        results = await self._exa_search(
+            f"{name} official website", num_results=5, exclude_domains=AGGREGATOR_DOMAINS
+        )
+        candidates = [r for r in results if r.get("url") and not _is_aggregator(r["url"])]
+        if not candidates:
+            print(f"⚠️ Could not resolve product URL for: {name}")
+            return "", ""
+        
+        # max() keeps Exa's ranking among equally good matches
+        best = max(candidates, key=lambda result: _name_match(name, result))
+        return _product_url(best["url"]), best.get("description", "")
+    
+    async def _discover_competitors(self, category: str) -> List[Dict]:
+        """Run query variants concurrently and rank products by reciprocal rank fusion"""
+        result_sets = await asyncio.gather(*[
+            self._exa_search(query.format(category=category), exclude_domains=AGGREGATOR_DOMAINS)
+            for query in DISCOVERY_QUERIES
+        ])
+        
+        scores: Dict[str, float] = {}
+        best_hit: Dict[str, Dict] = {}
+        for results in result_sets:
+            for rank, result in enumerate(results):
+                url = result.get("url", "")
+                if not url or _is_aggregator(url):
+                    continue
+                domain = _domain(url)
+                # One entry per product domain; agreement across variants ranks higher
+                scores[domain] = scores.get(domain, 0.0) + 1.0 / (60 + rank)
+                best_hit.setdefault(domain, result)
+        
+        ranked = sorted(scores, key=scores.get, reverse=True)[:self.max_competitors]
         competitor_list = []
-        for result in search_results[:5]:  # Top 5 results
+        for domain in ranked:
+            result = best_hit[domain]
             competitor_list.append({
-                "name": result.get("title", ""),
-                "url": result.get("url", ""),
+                "name": _product_name(result.get("title", ""), result["url"]),
+                "url": _product_url(result["url"]),
                 "description": result.get("description", ""),
                 "category": category
             })
@@ -64,6 +281,37 @@ class ProductAnalysisAgent:
         """Executor: Analyze competitor website and features"""
         print(f"📊 Analyzing: {competitor['name']}")
         
+        if not self.competitor_cache:
+            return await self._run_competitor_analysis(competitor)
+        
+        # Reuse an analysis of the same page from any market
+        fingerprint = await self._page_fingerprint(competitor["url"])
+        if not fingerprint:
+            # Without the page content a cached analysis can't be checked against it
+            return await self._run_competitor_analysis(competitor)
+        analysis, reused = await self.competitor_cache.get_or_compute(
+            competitor["url"],
+            fingerprint,
+            lambda: self._run_competitor_analysis(competitor),
+            cacheable=self._is_complete
+        )
+        if reused:
+            print(f"♻️ Reusing cached analysis for: {competitor['name']}")
+        
+        return {**analysis, "competitor": competitor["name"], "url": competitor["url"]}
+    
+    @staticmethod
+    def _is_complete(analysis: Dict) -> bool:
+        """True if every extracted field came back from the LLM, so the analysis is safe to cache"""
+        fields = [analysis["website_analysis"], analysis["pricing"], analysis["target_audience"]]
+        return (
+            bool(analysis["key_features"])
+            and not any(_unavailable(feature) for feature in analysis["key_features"])
+            and not any(_unavailable(field) for field in fields)
+        )
+    
+    async def _run_competitor_analysis(self, competitor: Dict) -> Dict:
+        """Run the website, feature, pricing and audience extraction for one competitor"""
         # Analyze website content
         website_analysis = await self._analyze_website(competitor["url"])
         
@@ -79,24 +327,63 @@ class ProductAnalysisAgent:
             "target_audience": await self._identify_audience(website_analysis)
         }
     
-    async def _generate_comparison_report(self, category: str, analyses: List[Dict]) -> Dict[str, Any]:
+    async def _page_fingerprint(self, url: str) -> str:
+        """Fingerprint of the competitor page content, empty if it can't be fetched"""
+        try:
+            response = await get_transport().request("GET", url, timeout=self.request_timeout)
+        except (DeadlineExceeded, CassetteMiss):
+            raise
+        except Exception as e:
+            print(f"⚠️ Could not fetch {url} for fingerprinting: {e}")
+            return ""
+        if response.status != 200:
+            return ""
+        # Regexes over the whole page would block the loop
+        return await asyncio.to_thread(lambda: content_fingerprint(response.text()))
+    
+    async def _generate_comparison_report(self, category: str, analyses: List[Dict],
+                                          missing: Dict[str, List[str]] = None) -> Dict[str, Any]:
         """Aggregator: Synthesize findings into comprehensive report"""
         print("📈 Generating comparison report...")
+        missing = missing if missing is not None else {"competitors": [], "sections": []}
         
-        # Use OpenRouter to generate structured analysis
-        prompt = self._create_analysis_prompt(category, analyses)
-        report = await self._get_llm_analysis(prompt)
+        if not analyses:
+            # Without competitors the LLM could only answer with generic filler
+            print("⚠️ No competitor analyses, market analysis and recommendations omitted")
+            missing["sections"].extend(["market_analysis", "recommendations"])
+            report, recommendations = "", []
+        else:
+            # Use OpenRouter to generate structured analysis
+            prompt = self._create_analysis_prompt(category, analyses)
+            try:
+                report = await self._get_llm_analysis(prompt, stage="report")
+            except DeadlineExceeded:
+                print("⏱️ Deadline reached, market analysis omitted")
+                report = ""
+            if not report or _unavailable(report):
+                report = ""
+                missing["sections"].append("market_analysis")
+            
+            try:
+                recommendations = await self._generate_recommendations(analyses)
+            except DeadlineExceeded:
+                print("⏱️ Deadline reached, recommendations omitted")
+                recommendations = None
+            if recommendations is None:
+                recommendations = []
+                missing["sections"].append("recommendations")
         
         return {
             "product_category": category,
             "competitors_analyzed": len(analyses),
             "comparison_matrix": self._create_feature_matrix(analyses),
             "market_analysis": report,
-            "recommendations": await self._generate_recommendations(analyses),
-            "timestamp": asyncio.get_event_loop().time()
+            "recommendations": recommendations,
+            "timestamp": asyncio.get_event_loop().time(),
+            **({"semantic_cache": self.semantic_cache.stats()} if self.semantic_cache else {})
         }
     
-    async def _exa_search(self, query: str) -> List[Dict]:
+    async def _exa_search(self, query: str, num_results: int = 10, exclude_domains=None) -> List[Dict]:
         """Tool: Search web using Exa API"""
         url = "https://api.exa.ai/search"
         headers = {
@@ -106,45 +393,140 @@ class ProductAnalysisAgent:
         data = {
             "query": query,
             "type": "neural",
-            "numResults": 10
+            "numResults": num_results
         }
+        if exclude_domains:
+            data["excludeDomains"] = sorted(exclude_domains)
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=data) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    return result.get("results", [])
-                else:
-                    print(f"❌ Exa search failed: {response.status}")
-                    return []
+        try:
+            response = await get_transport().request("POST", url, headers=headers, json=data, timeout=self.request_timeout)
+        except (DeadlineExceeded, CassetteMiss):
+            # Out of time for the whole run, or a replay that diverged from its cassette
+            raise
+        except Exception as e:
+            # Per-request timeouts and connection errors fail this search, not the run
+            print(f"❌ Exa search failed: {'timeout' if isinstance(e, asyncio.TimeoutError) else type(e).__name__}")
+            return []
+        if response.status == 200:
+            return response.json().get("results", [])
+        else:
+            print(f"❌ Exa search failed: {response.status}")
+            return []
     
     async def _analyze_website(self, url: str) -> str:
         """Tool: Analyze website content"""
         # Simplified website analysis
         # In production, this would use proper web scraping
         analysis_prompt = f"Analyze the website {url} and describe its main offerings, target audience, and key features."
-        return await self._get_llm_analysis(analysis_prompt)
+        return await self._get_llm_analysis(analysis_prompt, stage="website_analysis")
+    
+    async def _get_llm_analysis(self, prompt: str, stage: str = "website_analysis") -> str:
+        """Tool: Get analysis from OpenRouter, answering near-duplicate prompts from the semantic cache"""
+        if not self.semantic_cache:
+            return await self._routed_completion(prompt, stage)
+        
+        cached, similarity, audit = self.semantic_cache.lookup(stage, prompt)
+        if cached is not None and not audit:
+            return cached
+        
+        answer = await self._routed_completion(prompt, stage)
+        if _unavailable(answer):
+            return cached if cached is not None else answer
+        
+        if cached is not None:
+            # Audited hit: measure how well the cached answer matches a fresh one
+            agreement = self.semantic_cache.record_audit(stage, cached, answer)
+            print(f"🔬 Semantic cache audit ({stage}): similarity {similarity:.3f}, agreement {agreement:.3f}")
+        else:
+            self.semantic_cache.store(stage, prompt, answer)
+        return answer
     
-    async def _get_llm_analysis(self, prompt: str) -> str:
-        """Tool: Get analysis from OpenRouter"""
+    async def _routed_completion(self, prompt: str, stage: str) -> str:
+        """Send the prompt to the model routed for this stage, hedging if enabled"""
+        route = self._route(stage)
+        hedging = self.profile.get("routing", {}).get("hedging", {})
+        failures: List[str] = []
+        primary = asyncio.ensure_future(self._openrouter_request(prompt, route, failures))
+        
+        backup_model = hedging.get("backup_model")
+        if not hedging.get("enabled") or not backup_model or backup_model == route["model"]:
+            result = await primary
+            return result if result is not None else self._failure_message(failures)
+        
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self._hedge_delay(stage, route["model"]))
+            if primary in done and not primary.exception() and primary.result() is not None:
+                return primary.result()
+            
+            # Primary is slow (or failed): race a backup request and keep the first answer
+            pending.add(asyncio.ensure_future(
+                self._openrouter_request(prompt, {**route, "model": backup_model}, failures)
+            ))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.exception() and task.result() is not None:
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+        check_deadline(f"{stage} completion")
+        return self._failure_message(failures)
+    
+    @staticmethod
+    def _failure_message(failures: List[str]) -> str:
+        return f"Analysis unavailable: {failures[-1]}" if failures else "Analysis unavailable"
+    
+    def _record_latency(self, route: Dict[str, Any], started: float):
+        # Keyed on the stage too: one model serves stages with very different output lengths
+        key = (route["stage"], route["model"])
+        self._latencies.setdefault(key, deque(maxlen=200)).append(time.monotonic() - started)
+    
+    async def _openrouter_request(self, prompt: str, route: Dict[str, Any],
+                                  failures: List[str] = None) -> Optional[str]:
+        """Send one chat completion request, None if it failed (the reason is appended to failures)"""
         url = "https://openrouter.ai/api/v1/chat/completions"
         headers = {
             "Authorization": f"Bearer {self.openrouter_key}",
             "Content-Type": "application/json"
         }
         data = {
-            "model": self.model,
+            "model": route["model"],
             "messages": [{"role": "user", "content": prompt}],
-            "max_tokens": 4000
+            "max_tokens": route["max_tokens"]
         }
+        if route.get("temperature") is not None:
+            data["temperature"] = route["temperature"]
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=data) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    return result["choices"][0]["message"]["content"]
-                else:
-                    return f"Analysis unavailable: {response.status}"
+        started = time.monotonic()
+        try:
+            response = await get_transport().request("POST", url, headers=headers, json=data, timeout=self.request_timeout)
+        except asyncio.CancelledError:
+            # A request that lost a hedge race took at least this long;
+            # leaving it out would drag the latency percentile down
+            self._record_latency(route, started)
+            raise
+        except (DeadlineExceeded, CassetteMiss):
+            # Out of time for the whole run, or a replay that diverged from its cassette
+            raise
+        except Exception as e:
+            # Per-request timeouts and connection errors fail this call, not the run
+            if isinstance(e, asyncio.TimeoutError):
+                self._record_latency(route, started)
+            reason = "timeout" if isinstance(e, asyncio.TimeoutError) else type(e).__name__
+            print(f"❌ OpenRouter request failed ({route['model']}): {reason}")
+            if failures is not None:
+                failures.append(reason)
+            return None
+        if response.status == 200:
+            self._record_latency(route, started)
+            return response.json()["choices"][0]["message"]["content"]
+        else:
+            print(f"❌ OpenRouter request failed ({route['model']}): {response.status}")
+            if failures is not None:
+                failures.append(str(response.status))
+            return None
     
     def _create_analysis_prompt(self, category: str, analyses: List[Dict]) -> str:
         """Create detailed analysis prompt for LLM"""
@@ -196,21 +578,21 @@ class ProductAnalysisAgent:
         
         Return only a comma-separated list of features, no explanations.
         """
-        features_text = await self._get_llm_analysis(prompt)
+        features_text = await self._get_llm_analysis(prompt, stage="extraction.features")
         return [f.strip() for f in features_text.split(",") if f.strip()]
     
     async def _extract_pricing(self, analysis: str) -> str:
         """Extract pricing information"""
         prompt = f"Extract pricing information from: {analysis[:800]}"
-        return await self._get_llm_analysis(prompt)
+        return await self._get_llm_analysis(prompt, stage="extraction.pricing")
     
     async def _identify_audience(self, analysis: str) -> str:
         """Identify target audience"""
         prompt = f"Identify the target audience from: {analysis[:800]}"
-        return await self._get_llm_analysis(prompt)
+        return await self._get_llm_analysis(prompt, stage="extraction.audience")
     
-    async def _generate_recommendations(self, analyses: List[Dict]) -> List[str]:
-        """Generate strategic recommendations"""
+    async def _generate_recommendations(self, analyses: List[Dict]) -> Optional[List[str]]:
+        """Generate strategic recommendations, None if the LLM call failed"""
         analysis_summary = "\n".join([
             f"- {a['competitor']}: {a['website_analysis'][:200]}..."
             for a in analyses
@@ -223,7 +605,9 @@ class ProductAnalysisAgent:
         
         Return as a numbered list of recommendations.
         """
-        recommendations = await self._get_llm_analysis(prompt)
+        recommendations = await self._get_llm_analysis(prompt, stage="recommendations")
+        if _unavailable(recommendations):
+            return None
         return [rec.strip() for rec in recommendations.split("\n") if rec.strip() and rec[0].isdigit()]
 
 # Example usage
@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+import yaml
+
+import main
+from main import ProductAnalysisAgent
+from tools import http_transport
+from tools.competitor_cache import CompetitorCache, canonical_url, content_fingerprint
+from tools.deadline import DeadlineExceeded, deadline_scope
+from tools.http_transport import HttpTransport, TransportResponse
+
+
+def test_canonical_url_ignores_scheme_www_query_and_trailing_slash():
+    assert canonical_url("https://www.Slack.com/features/?utm=x#top") == "slack.com/features"
+    assert canonical_url("http://slack.com/features") == "slack.com/features"
+    assert canonical_url("slack.com") == "slack.com"
+    assert canonical_url("https://github.com/features/copilot") != canonical_url("https://github.com")
+
+
+def test_content_fingerprint_tracks_visible_text_only():
+    page = "<html><head><style>p {color: red}</style></head><body><p>Team chat</p></body></html>"
+    restyled = "<div class='x'>  team   CHAT </div><script>track()</script>"
+    assert content_fingerprint(page) == content_fingerprint(restyled)
+    assert content_fingerprint(page) != content_fingerprint("<p>Team chat and video</p>")
+
+
+def test_concurrent_callers_share_one_computation(tmp_path):
+    cache = CompetitorCache(str(tmp_path / "competitors.sqlite"))
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"pricing": "Free"}
+
+    async def main():
+        return await asyncio.gather(*[
+            cache.get_or_compute("https://slack.com", "f1", compute) for _ in range(3)
+        ])
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    # Callers reach the in-flight check in whatever order their cache reads finish
+    assert sorted(reused for _, reused in results) == [False, True, True]
+    assert cache.get("https://www.slack.com/", "f1") == {"pricing": "Free"}
+    assert cache.get("https://slack.com", "other-fingerprint") is None
+
+
+def test_uncacheable_results_are_not_stored(tmp_path):
+    cache = CompetitorCache(str(tmp_path / "competitors.sqlite"))
+
+    async def compute():
+        return {"pricing": "Analysis unavailable: 500"}
+
+    result, reused = asyncio.run(cache.get_or_compute(
+        "https://slack.com", "f1", compute, cacheable=lambda r: not r["pricing"].startswith("Analysis unavailable")
+    ))
+    assert not reused
+    assert cache.get("https://slack.com", "f1") is None
+
+
+def test_waiter_deadlines_are_independent(tmp_path):
+    cache = CompetitorCache(str(tmp_path / "competitors.sqlite"))
+
+    async def compute():
+        await asyncio.sleep(0.3)
+        return {"pricing": "Free"}
+
+    async def short_job():
+        with deadline_scope(0.1):
+            await cache.get_or_compute("https://slack.com", "f1", compute)
+
+    async def long_job():
+        with deadline_scope(5):
+            await asyncio.sleep(0.01)
+            return await cache.get_or_compute("https://slack.com", "f1", compute)
+
+    async def main():
+        return await asyncio.gather(short_job(), long_job(), return_exceptions=True)
+
+    short, long = asyncio.run(main())
+    assert isinstance(short, DeadlineExceeded)
+    assert long == ({"pricing": "Free"}, True)
+
+
+def test_abandoned_computation_is_cancelled(tmp_path):
+    cache = CompetitorCache(str(tmp_path / "competitors.sqlite"))
+    finished = []
+
+    async def compute():
+        await asyncio.sleep(0.3)
+        finished.append(1)
+        return {"pricing": "Free"}
+
+    async def main():
+        with deadline_scope(0.05):
+            with pytest.raises(DeadlineExceeded):
+                await cache.get_or_compute("https://slack.com", "f1", compute)
+        await asyncio.sleep(0.4)
+
+    asyncio.run(main())
+    assert finished == []
+    assert cache._inflight == {}
+
+
+class _PageTransport(HttpTransport):
+    """Serves a fixed page, or fails every request if page is None"""
+
+    def __init__(self, page):
+        super().__init__()
+        self.page = page
+
+    async def _perform(self, method, url, headers, json):
+        if self.page is None:
+            raise ConnectionError("unreachable")
+        return TransportResponse(200, self.page.encode())
+
+
+class _CountingAgent(ProductAnalysisAgent):
+    def __init__(self):
+        super().__init__("cached")
+        self.runs = 0
+
+    async def _run_competitor_analysis(self, competitor):
+        self.runs += 1
+        return {"competitor": competitor["name"], "url": competitor["url"], "website_analysis": "Chat",
+                "key_features": ["Channels"], "pricing": "Free", "target_audience": "Teams"}
+
+
+@pytest.mark.parametrize("page, runs", [("<p>Team chat</p>", 1), (None, 2)])
+def test_agent_bypasses_the_cache_when_the_page_cannot_be_fingerprinted(tmp_path, monkeypatch, page, runs):
+    (tmp_path / "cached.yaml").write_text(yaml.safe_dump({"analysis": {"competitor_cache": {
+        "enabled": True, "path": str(tmp_path / "competitors.sqlite")
+    }}}))
+    monkeypatch.setattr(main, "PROFILES_DIR", str(tmp_path))
+    monkeypatch.setattr(http_transport, "_transport", _PageTransport(page))
+    agent = _CountingAgent()
+    competitor = {"name": "Slack", "url": "https://slack.com"}
+
+    async def run():
+        for _ in range(2):
+            await agent._analyze_competitor(competitor)
+
+    asyncio.run(run())
+    assert agent.runs == runs
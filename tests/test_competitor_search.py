@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+import main
+from main import ProductAnalysisAgent, _name_match, _product_name
+
+
+class _SearchAgent(ProductAnalysisAgent):
+    """Agent whose Exa searches are served from canned results keyed by query"""
+
+    def __init__(self, results, max_competitors=5):
+        super().__init__()
+        self.results = results
+        self.queries = []
+        self.max_competitors = max_competitors
+
+    async def _exa_search(self, query, num_results=10, exclude_domains=None):
+        self.queries.append(query)
+        return self.results.get(query, [])
+
+
+@pytest.fixture(autouse=True)
+def _empty_profile(tmp_path, monkeypatch):
+    # No profile: no competitor cache written to the working directory
+    monkeypatch.setattr(main, "PROFILES_DIR", str(tmp_path))
+
+
+def _hit(url, title=""):
+    return {"url": url, "title": title, "description": f"About {url}"}
+
+
+def test_discovery_ranks_by_reciprocal_rank_fusion():
+    queries = [query.format(category="CRM") for query in main.DISCOVERY_QUERIES]
+    agent = _SearchAgent({
+        # Top result of one variant only
+        queries[0]: [_hit("https://solo.com", "Solo CRM"), _hit("https://www.hubspot.com/products/crm?utm=x", "HubSpot | CRM")],
+        queries[1]: [_hit("https://pipedrive.com", "Pipedrive"), _hit("https://hubspot.com/pricing", "HubSpot pricing")],
+        queries[2]: [_hit("https://hubspot.com", "HubSpot"), _hit("https://pipedrive.com/en", "Pipedrive")],
+    })
+
+    competitors = asyncio.run(agent._discover_competitors("CRM"))
+
+    assert [c["name"] for c in competitors] == ["HubSpot", "Pipedrive", "Solo CRM"]
+    # One entry per domain, from the first hit seen, without query string
+    assert competitors[0]["url"] == "https://www.hubspot.com/products/crm"
+    assert all(c["category"] == "CRM" for c in competitors)
+
+
+def test_discovery_drops_aggregators_and_caps_results():
+    query = main.DISCOVERY_QUERIES[0].format(category="CRM")
+    agent = _SearchAgent({query: [
+        _hit("https://www.g2.com/categories/crm", "Best CRM Software"),
+        _hit("https://blog.capterra.com/top-crm", "Top CRM"),
+        *[_hit(f"https://crm{i}.com", f"CRM {i}") for i in range(5)],
+    ]}, max_competitors=3)
+
+    competitors = asyncio.run(agent._discover_competitors("CRM"))
+
+    assert [c["url"] for c in competitors] == ["https://crm0.com", "https://crm1.com", "https://crm2.com"]
+
+
+def test_product_name_strips_title_taglines():
+    assert _product_name("GitHub Copilot · Your AI pair programmer", "https://github.com/features/copilot") == "GitHub Copilot"
+    assert _product_name("Tabnine - AI code assistant | Tabnine", "https://tabnine.com") == "Tabnine"
+    assert _product_name("", "https://www.pipedrive.com") == "Pipedrive"
+
+
+def test_name_match_counts_whole_words_only():
+    result = _hit("https://mailchimp.com/email", "Email marketing")
+    assert _name_match("AI mail", result) == 0
+    assert _name_match("Mailchimp email", result) == 2
+
+
+def test_named_competitor_resolves_to_its_product_page():
+    agent = _SearchAgent({"GitHub Copilot official website": [
+        _hit("https://github.com/", "GitHub: Let's build from here"),
+        _hit("https://www.g2.com/products/github-copilot", "GitHub Copilot Reviews"),
+        _hit("https://github.com/features/copilot?ref=nav#pricing", "GitHub Copilot · Your AI pair programmer"),
+    ]})
+
+    competitors = asyncio.run(agent._search_competitors("AI coding assistants", ["GitHub Copilot"]))
+
+    assert [(c["name"], c["url"]) for c in competitors] == [("GitHub Copilot", "https://github.com/features/copilot")]
+
+
+def test_unresolved_competitor_is_missing_and_not_cached():
+    agent = _SearchAgent({"Tabnine official website": [_hit("https://tabnine.com", "Tabnine")]})
+    missing = {"competitors": [], "sections": []}
+
+    async def run():
+        first = await agent._search_competitors("AI coding assistants", ["Tabnine", "Nonexistent"], missing)
+        second = await agent._search_competitors("AI coding assistants", ["Tabnine", "Nonexistent"])
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert [c["name"] for c in first] == [c["name"] for c in second] == ["Tabnine"]
+    assert missing["competitors"] == ["Nonexistent"]
+    # The resolved name is looked up once, the empty lookup is retried
+    assert agent.queries.count("Tabnine official website") == 1
+    assert agent.queries.count("Nonexistent official website") == 2
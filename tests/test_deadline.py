@@ -0,0 +1,111 @@
+import asyncio
+import gzip
+import time
+
+import pytest
+
+import main
+from main import ProductAnalysisAgent
+from tools import http_transport
+from tools.deadline import (
+    DeadlineExceeded, check_deadline, current_deadline, deadline_scope, remaining_time, without_deadline
+)
+from tools.http_transport import CassetteMiss, HttpTransport, TransportResponse
+
+
+def test_no_deadline_by_default():
+    assert current_deadline() is None
+    assert remaining_time() is None
+    check_deadline()
+
+
+def test_nested_scopes_can_only_shorten():
+    with deadline_scope(10) as outer:
+        with deadline_scope(60) as inner:
+            assert inner is outer
+        with deadline_scope(0.5):
+            assert remaining_time() <= 0.5
+        assert remaining_time() > 5
+    assert current_deadline() is None
+
+
+def test_check_deadline_raises_once_expired():
+    with deadline_scope(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            check_deadline("test")
+
+
+def test_deadline_follows_spawned_tasks_but_not_detached_context():
+    async def _remaining():
+        return remaining_time()
+
+    async def main():
+        with deadline_scope(5):
+            inherited = await asyncio.ensure_future(_remaining())
+            detached = await without_deadline().run(asyncio.ensure_future, _remaining())
+        return inherited, detached
+
+    inherited, detached = asyncio.run(main())
+    assert inherited is not None and inherited <= 5
+    assert detached is None
+
+
+class _SlowTransport(HttpTransport):
+    async def _perform(self, method, url, headers, json):
+        await asyncio.sleep(1)
+        return TransportResponse(200, b"{}")
+
+
+def test_transport_raises_deadline_exceeded_when_deadline_binds():
+    async def main():
+        with deadline_scope(0.05):
+            await _SlowTransport().request("GET", "https://example.com", timeout=30)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(main())
+
+
+def test_transport_request_timeout_is_a_plain_timeout():
+    async def main():
+        with deadline_scope(30):
+            await _SlowTransport().request("GET", "https://example.com", timeout=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(main())
+
+
+class _NoCompetitorsAgent(ProductAnalysisAgent):
+    def __init__(self):
+        super().__init__("none")
+        self.prompts = []
+
+    async def _get_llm_analysis(self, prompt, stage="website_analysis"):
+        self.prompts.append(stage)
+        return "Generic market overview"
+
+
+def test_report_sections_are_missing_without_any_competitor_analysis(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "PROFILES_DIR", str(tmp_path))
+    agent = _NoCompetitorsAgent()
+    missing = {"competitors": ["Slack"], "sections": []}
+
+    report = asyncio.run(agent._generate_comparison_report("Team chat", [], missing))
+
+    assert agent.prompts == []
+    assert (report["market_analysis"], report["recommendations"]) == ("", [])
+    assert missing["sections"] == ["market_analysis", "recommendations"]
+
+
+def test_cassette_miss_fails_the_run_instead_of_degrading_it(tmp_path, monkeypatch):
+    cassette = tmp_path / "empty.jsonl.gz"
+    with gzip.open(cassette, "wt"):
+        pass
+    monkeypatch.setattr(main, "PROFILES_DIR", str(tmp_path))
+    monkeypatch.setattr(http_transport, "_transport", HttpTransport("replay", str(cassette)))
+    agent = ProductAnalysisAgent("none")
+
+    with pytest.raises(CassetteMiss):
+        asyncio.run(agent._exa_search("team chat"))
+    with pytest.raises(CassetteMiss):
+        asyncio.run(agent._openrouter_request("prompt", agent._route("report")))
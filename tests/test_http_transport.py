@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from tools.http_transport import CassetteMiss, HttpTransport, _request_key
+
+
+def test_request_key_ignores_headers_and_payload_key_order():
+    assert _request_key("post", "https://api.exa.ai/search", {"a": 1, "b": 2}) == \
+        _request_key("POST", "https://api.exa.ai/search", {"b": 2, "a": 1})
+    assert _request_key("POST", "https://api.exa.ai/search", {"a": 1}) != \
+        _request_key("POST", "https://api.exa.ai/search", {"a": 2})
+
+
+async def _serve(handler):
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_record_then_replay_round_trip(tmp_path):
+    cassette = str(tmp_path / "cassettes" / "run.jsonl.gz")
+    counter = {"n": 0}
+
+    async def handler(request):
+        counter["n"] += 1
+        payload = await request.json()
+        return web.json_response({"echo": payload, "call": counter["n"]})
+
+    async def record():
+        runner, base = await _serve(handler)
+        try:
+            transport = HttpTransport("record", cassette)
+            first = await transport.request("POST", f"{base}/search", json={"q": "crm"})
+            second = await transport.request("POST", f"{base}/search", json={"q": "crm"})
+            return base, first.json(), second.json()
+        finally:
+            await runner.cleanup()
+
+    base, first, second = asyncio.run(record())
+    assert (first["call"], second["call"]) == (1, 2)
+
+    # The server is gone: replay must come entirely from the cassette, in order
+    replay = HttpTransport("replay", cassette, replay_latency=False)
+
+    async def run_replay():
+        responses = [await replay.request("POST", f"{base}/search", json={"q": "crm"}) for _ in range(3)]
+        return [r.json()["call"] for r in responses]
+
+    assert asyncio.run(run_replay()) == [1, 2, 2]
+    replay.rewind()
+    assert asyncio.run(run_replay()) == [1, 2, 2]
+
+    with pytest.raises(CassetteMiss):
+        asyncio.run(replay.request("POST", f"{base}/search", json={"q": "other"}))
+
+
+def test_replay_requires_cassette():
+    with pytest.raises(ValueError):
+        HttpTransport("replay")
@@ -0,0 +1,93 @@
+import asyncio
+import sys
+import time
+
+from tools.loop_monitor import monitor_loop, monitored
+
+
+def _block(seconds):
+    time.sleep(seconds)
+
+
+def test_stall_is_attributed_to_the_blocking_session_only():
+    async def blocking_run():
+        async with monitor_loop("blocking") as session:
+            await asyncio.sleep(0.1)
+            _block(0.4)
+            await asyncio.sleep(0.1)
+        return session.report()
+
+    async def quiet_run():
+        async with monitor_loop("quiet") as session:
+            await asyncio.sleep(0.7)
+        return session.report()
+
+    async def main():
+        return await asyncio.gather(blocking_run(), quiet_run())
+
+    blocking, quiet = asyncio.run(main())
+    assert [entry["function"].split()[0] for entry in blocking["blocking_calls"]] == ["_block"]
+    assert blocking["blocking_calls"][0]["total_seconds"] >= 0.3
+    assert quiet["blocking_calls"] == []
+    # Loop lag is loop-wide, so the quiet run still sees it
+    assert quiet["max_lag_seconds"] >= 0.3
+
+
+def test_monitored_reports_a_stall_right_before_returning(capsys):
+    @monitored
+    async def parse_document():
+        _block(0.3)
+        return "parsed"
+
+    assert asyncio.run(parse_document()) == "parsed"
+    assert "parse_document blocked the loop in _block" in capsys.readouterr().out
+
+
+def test_disabled_monitor_yields_none():
+    async def main():
+        async with monitor_loop(config={"enabled": False}) as session:
+            return session
+
+    assert asyncio.run(main()) is None
+
+
+def test_session_opened_while_the_last_one_closes_gets_a_live_monitor():
+    async def closing():
+        async with monitor_loop("closing"):
+            pass
+
+    async def opening():
+        # Resumes while closing() awaits the old monitor's sampler
+        await asyncio.sleep(0)
+        async with monitor_loop("opening") as session:
+            await asyncio.sleep(0.1)
+            _block(0.4)
+            await asyncio.sleep(0.1)
+        return session.report()
+
+    async def main():
+        return (await asyncio.gather(closing(), opening()))[1]
+
+    report = asyncio.run(main())
+    assert report["samples"] > 1
+    assert [entry["function"].split()[0] for entry in report["blocking_calls"]] == ["_block"]
+    assert report["blocking_calls"][0]["stack"]
+
+
+def test_task_factory_is_only_installed_before_python_3_12_and_never_clobbered():
+    def custom_factory(loop, coro, **kwargs):
+        return asyncio.Task(coro, loop=loop, **kwargs)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        async with monitor_loop("plain"):
+            during = loop.get_task_factory()
+        after = loop.get_task_factory()
+        async with monitor_loop("replaced"):
+            loop.set_task_factory(custom_factory)
+        return during, after, loop.get_task_factory()
+
+    during, after, replaced = asyncio.run(main())
+    assert (during is not None) == (sys.version_info < (3, 12))
+    assert after is None
+    assert replaced is custom_factory
@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+import pytest
+import yaml
+
+import main
+from main import ProductAnalysisAgent
+
+PROFILE = {
+    "agents": {
+        "atomizer": {"llm": {"model": "small", "temperature": 0.3, "max_tokens": 2000}},
+        "executor": {"llm": {"model": "large", "max_tokens": 4000}},
+        "aggregator": {"llm": {"temperature": 0.2}},
+    },
+    "routing": {
+        "stages": {
+            "extraction": {"agent": "atomizer", "max_tokens": 500},
+            "website_analysis": {"agent": "executor", "max_tokens": 1500},
+            "report": {"agent": "aggregator"},
+        },
+        "hedging": {"enabled": True, "backup_model": "backup", "initial_delay": 0.2, "min_samples": 3},
+    },
+}
+
+
+class _RaceAgent(ProductAnalysisAgent):
+    """Agent whose OpenRouter calls answer after a fixed delay per model (None for a failure)"""
+
+    def __init__(self, responses):
+        super().__init__("routing")
+        self.responses = responses
+        self.started = []
+        self.cancelled = []
+
+    async def _openrouter_request(self, prompt, route, failures=None):
+        model = route["model"]
+        self.started.append(model)
+        delay, answer = self.responses[model]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        if answer is None and failures is not None:
+            failures.append("500")
+        return answer
+
+
+@pytest.fixture(autouse=True)
+def _routing_profile(tmp_path, monkeypatch):
+    (tmp_path / "routing.yaml").write_text(yaml.safe_dump(PROFILE))
+    monkeypatch.setattr(main, "PROFILES_DIR", str(tmp_path))
+    monkeypatch.setenv("OPENROUTER_MODEL", "env-model")
+
+
+def test_route_falls_back_to_parent_stage_agent_and_env_model():
+    agent = ProductAnalysisAgent("routing")
+
+    pricing = agent._route("extraction.pricing")
+    assert (pricing["stage"], pricing["model"], pricing["max_tokens"]) == ("extraction.pricing", "small", 500)
+    assert agent._route("unknown")["model"] == "large"  # executor by default
+    report = agent._route("report")
+    assert (report["model"], report["temperature"], report["max_tokens"]) == ("env-model", 0.2, 4000)
+
+
+def test_hedge_delay_is_learned_per_stage():
+    agent = ProductAnalysisAgent("routing")
+    for seconds in (1.0, 2.0, 3.0):
+        agent._record_latency({"stage": "website_analysis", "model": "large"}, time.monotonic() - seconds)
+
+    assert agent._hedge_delay("website_analysis", "large") == pytest.approx(3.0, abs=0.1)
+    assert agent._hedge_delay("report", "large") == 0.2
+
+
+def test_fast_primary_is_not_hedged():
+    agent = _RaceAgent({"large": (0.01, "primary"), "backup": (0.01, "backup")})
+
+    assert asyncio.run(agent._routed_completion("prompt", "website_analysis")) == "primary"
+    assert agent.started == ["large"]
+
+
+def test_backup_wins_when_primary_is_slow():
+    agent = _RaceAgent({"large": (2.0, "primary"), "backup": (0.05, "backup")})
+
+    started = time.monotonic()
+    assert asyncio.run(agent._routed_completion("prompt", "website_analysis")) == "backup"
+    assert time.monotonic() - started < 1.0
+    assert agent.cancelled == ["large"]
+
+
+def test_backup_is_sent_as_soon_as_primary_fails():
+    agent = _RaceAgent({"large": (0.01, None), "backup": (0.01, "backup")})
+
+    started = time.monotonic()
+    assert asyncio.run(agent._routed_completion("prompt", "website_analysis")) == "backup"
+    # Well before the 0.2s hedge delay
+    assert time.monotonic() - started < 0.15
+
+
+def test_both_failing_returns_the_failure_message():
+    agent = _RaceAgent({"large": (0.01, None), "backup": (0.01, None)})
+
+    assert asyncio.run(agent._routed_completion("prompt", "website_analysis")) == "Analysis unavailable: 500"
+
+
+def test_cancelling_during_hedge_delay_cancels_the_primary():
+    agent = _RaceAgent({"large": (2.0, "primary"), "backup": (2.0, "backup")})
+
+    async def run():
+        call = asyncio.ensure_future(agent._get_llm_analysis("prompt", "website_analysis"))
+        await asyncio.sleep(0.1)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        await asyncio.sleep(0)
+        # Checked before asyncio.run() cancels leftover tasks on shutdown
+        assert agent.cancelled == ["large"]
+
+    asyncio.run(run())
+    assert agent.started == ["large"]
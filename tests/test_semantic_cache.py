@@ -0,0 +1,72 @@
+import numpy as np
+
+from tools.semantic_cache import HashingVectorizer, SemanticCache, _StageIndex
+
+ANALYSIS = (
+    "Slack is a channel-based messaging platform for teams. It offers a free plan with 90 days of "
+    "message history, a Pro plan at $8.75 per user per month, Business+ at $15 per user per month and "
+    "custom Enterprise Grid pricing. Key features include channels, huddles, clips, workflow builder, "
+    "thousands of app integrations, Slack Connect for working with external partners and enterprise "
+    "grade security with SSO, data residency and audit logs. It is aimed at knowledge workers in "
+    "startups, mid-sized companies and large enterprises, especially engineering, product and sales "
+    "teams that rely on real-time collaboration across time zones and with outside organisations."
+)
+
+
+def test_vectorizer_is_deterministic_and_normalised():
+    vectorizer = HashingVectorizer(1024)
+    first, second = vectorizer.transform(ANALYSIS), vectorizer.transform(ANALYSIS)
+    assert np.array_equal(first, second)
+    assert abs(float(np.linalg.norm(first)) - 1.0) < 1e-5
+    assert not vectorizer.transform("").any()
+
+
+def test_index_grows_then_evicts_oldest():
+    index = _StageIndex(dimensions=4, capacity=100)
+    for i in range(150):
+        vector = np.zeros(4, dtype=np.float32)
+        vector[i % 4] = 1.0
+        index.add(vector, str(i))
+    assert len(index.answers) == 100
+    assert "0" not in index.answers and "149" in index.answers
+
+
+def test_near_duplicate_prompt_hits():
+    cache = SemanticCache({"extraction": 0.9})
+    cache.store("extraction.pricing", f"Extract pricing information from: {ANALYSIS}", "Free, $8.75, $15")
+    answer, similarity, _ = cache.lookup(
+        "extraction.pricing", f"Extract pricing information from: {ANALYSIS.replace('large', 'big')}"
+    )
+    assert answer == "Free, $8.75, $15"
+    assert similarity >= 0.9
+    assert cache.stats()["extraction.pricing"]["hits"] == 1
+
+
+def test_extractors_on_the_same_analysis_do_not_share_answers():
+    cache = SemanticCache({"extraction": 0.95})
+    pricing_prompt = f"Extract pricing information from: {ANALYSIS[:800]}"
+    audience_prompt = f"Identify the target audience from: {ANALYSIS[:800]}"
+
+    # The prompts differ only in their prefix, so a shared index would confuse them
+    vectorizer = cache.vectorizer
+    assert float(vectorizer.transform(pricing_prompt) @ vectorizer.transform(audience_prompt)) > 0.95
+
+    cache.store("extraction.pricing", pricing_prompt, "Free, $8.75, $15")
+    answer, _, _ = cache.lookup("extraction.audience", audience_prompt)
+    assert answer is None
+
+
+def test_stages_without_threshold_are_never_cached():
+    cache = SemanticCache({"extraction": 0.9})
+    cache.store("report", ANALYSIS, "report")
+    assert cache.lookup("report", ANALYSIS) == (None, 0.0, False)
+    assert "report" not in cache.stats()
+
+
+def test_audit_metrics():
+    cache = SemanticCache({"recommendations": 0.9}, audit_rate=1.0)
+    cache.store("recommendations", ANALYSIS, "1. Lower prices")
+    answer, _, audit = cache.lookup("recommendations", ANALYSIS)
+    assert answer == "1. Lower prices" and audit
+    cache.record_audit("recommendations", answer, "1. Lower prices")
+    assert cache.stats()["recommendations"]["mean_audit_agreement"] == 1.0
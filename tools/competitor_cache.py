@@ -0,0 +1,154 @@
+"""
+Competitor-level result cache
+Stores per-competitor analyses (features, pricing, audience) keyed on the
+canonical product URL and a fingerprint of the page content, so any market
+that includes the same product can reuse them
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from .deadline import DeadlineExceeded, remaining_time, without_deadline
+
+_SCRIPT_STYLE = re.compile(r"<(script|style|noscript)\b.*?</\1>", re.IGNORECASE | re.DOTALL)
+_TAG = re.compile(r"<[^>]+>")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def canonical_url(url: str) -> str:
+    """Host (without www.) plus path, ignoring scheme, query, fragment and trailing slash"""
+    parsed = urlparse(url if "://" in url else f"https://{url}")
+    host = parsed.netloc.lower().split(":")[0]
+    if host.startswith("www."):
+        host = host[4:]
+    return host + parsed.path.rstrip("/")
+
+
+def content_fingerprint(html: str) -> str:
+    """Hash of the visible page text, stable across markup-only changes"""
+    text = _TAG.sub(" ", _SCRIPT_STYLE.sub(" ", html))
+    text = _WHITESPACE.sub(" ", text).strip().lower()
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+class CompetitorCache:
+    """
+    SQLite-backed so separate processes (concurrent batch jobs) share results;
+    in-process duplicate work is coalesced onto a single in-flight task.
+    Database calls run in a worker thread so a locked database never blocks the loop.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 7 * 24 * 3600):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._inflight: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS competitors ("
+                " url TEXT NOT NULL, fingerprint TEXT NOT NULL, created_at REAL NOT NULL,"
+                " analysis TEXT NOT NULL, PRIMARY KEY (url, fingerprint))"
+            )
+
+    @classmethod
+    def from_profile(cls, profile: Dict[str, Any]) -> Optional["CompetitorCache"]:
+        """Build the cache from analysis.competitor_cache, None if disabled"""
+        config = profile.get("analysis", {}).get("competitor_cache", {})
+        if not config.get("enabled", False):
+            return None
+        return cls(
+            path=config.get("path", ".cache/competitors.sqlite"),
+            ttl_seconds=config.get("ttl_hours", 168) * 3600
+        )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Short-lived connection, committed and closed on exit"""
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, url: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Cached analysis for this URL and content, if still within the freshness window"""
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT analysis FROM competitors WHERE url = ? AND fingerprint = ? AND created_at >= ?",
+                (canonical_url(url), fingerprint, time.time() - self.ttl_seconds)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, url: str, fingerprint: str, analysis: Dict[str, Any]):
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO competitors (url, fingerprint, created_at, analysis) VALUES (?, ?, ?, ?)",
+                (canonical_url(url), fingerprint, time.time(), json.dumps(analysis))
+            )
+
+    def prune(self) -> int:
+        """Delete entries older than the freshness window, returning how many were removed"""
+        with self._connect() as db:
+            cursor = db.execute(
+                "DELETE FROM competitors WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+        return cursor.rowcount
+
+    async def get_or_compute(self, url: str, fingerprint: str,
+                             compute: Callable[[], Awaitable[Dict[str, Any]]],
+                             cacheable: Callable[[Dict[str, Any]], bool] = lambda result: True
+                             ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Return (analysis, reused), computing and storing it only on a miss.
+        The shared computation runs without any caller's deadline; each caller
+        waits only until its own deadline, and the computation is cancelled
+        once nobody is waiting for it.
+        """
+        cached = await asyncio.to_thread(self.get, url, fingerprint)
+        if cached is not None:
+            return cached, True
+
+        key = (canonical_url(url), fingerprint)
+        entry = self._inflight.get(key)
+        reused = entry is not None
+        if entry is None:
+            task = without_deadline().run(
+                asyncio.ensure_future, self._compute_and_store(key, url, fingerprint, compute, cacheable)
+            )
+            entry = self._inflight[key] = {"task": task, "waiters": 0}
+
+        entry["waiters"] += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(entry["task"]), remaining_time()), reused
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"Deadline exceeded waiting for analysis of {url}") from None
+        finally:
+            entry["waiters"] -= 1
+            if not entry["waiters"] and not entry["task"].done():
+                entry["task"].cancel()
+                if self._inflight.get(key) is entry:
+                    del self._inflight[key]
+
+    async def _compute_and_store(self, key: Tuple[str, str], url: str, fingerprint: str,
+                                 compute: Callable[[], Awaitable[Dict[str, Any]]],
+                                 cacheable: Callable[[Dict[str, Any]], bool]) -> Dict[str, Any]:
+        try:
+            result = await compute()
+            if cacheable(result):
+                await asyncio.to_thread(self.put, url, fingerprint, result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
@@ -0,0 +1,71 @@
+"""
+Request-scoped deadlines
+A deadline set at the top of a run is carried in a context variable through
+every stage, task and HTTP request, so each call only gets the time left
+"""
+
+import contextlib
+import contextvars
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the run's deadline has passed"""
+
+
+class Deadline:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+_current: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline, None if no deadline is set"""
+    deadline = _current.get()
+    return deadline.remaining() if deadline else None
+
+
+def check_deadline(stage: str = ""):
+    """Cooperative cancellation point: raise if the current deadline has passed"""
+    deadline = _current.get()
+    if deadline and deadline.expired:
+        raise DeadlineExceeded(f"Deadline of {deadline.seconds}s exceeded" + (f" during {stage}" if stage else ""))
+
+
+def without_deadline() -> contextvars.Context:
+    """Copy of the current context with no deadline, for work shared between callers"""
+    context = contextvars.copy_context()
+    context.run(_current.set, None)
+    return context
+
+
+@contextlib.contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """Run a block under a deadline; nested scopes can only shorten it"""
+    if seconds is None:
+        yield _current.get()
+        return
+    deadline = Deadline(seconds)
+    outer = _current.get()
+    if outer and outer.expires_at < deadline.expires_at:
+        deadline = outer
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
@@ -1,7 +1,7 @@
 from roma import tool
-import aiohttp
 import os
 from typing import List, Dict, Any
+from .http_transport import get_transport
 
 @tool("search_competitors", description="Search for competitor products and alternatives using Exa")
 async def search_competitors(product_category: str, max_results: int = 10) -> List[Dict[str, Any]]:
@@ -27,23 +27,22 @@ async def search_competitors(product_category: str, max_results: int = 10) -> Li
         "excludeDomains": ["wikipedia.org", "reddit.com"]
     }
     
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, headers=headers, json=data) as response:
-            if response.status == 200:
-                result = await response.json()
-                competitors = []
-                
-                for item in result.get("results", []):
-                    competitors.append({
-                        "name": item.get("title", ""),
-                        "url": item.get("url", ""),
-                        "description": item.get("description", ""),
-                        "content": item.get("content", "")[:500] + "..." if item.get("content") else "",
-                        "published_date": item.get("publishedDate", ""),
-                        "author": item.get("author", "")
-                    })
-                
-                return competitors
-            else:
-                error_text = await response.text()
-                return [{"error": f"Exa search failed: {response.status}", "details": error_text}]
+    response = await get_transport().request("POST", url, headers=headers, json=data)
+    if response.status == 200:
+        result = response.json()
+        competitors = []
+        
+        for item in result.get("results", []):
+            competitors.append({
+                "name": item.get("title", ""),
+                "url": item.get("url", ""),
+                "description": item.get("description", ""),
+                "content": item.get("content", "")[:500] + "..." if item.get("content") else "",
+                "published_date": item.get("publishedDate", ""),
+                "author": item.get("author", "")
+            })
+        
+        return competitors
+    else:
+        error_text = response.text()
+        return [{"error": f"Exa search failed: {response.status}", "details": error_text}]
@@ -0,0 +1,187 @@
+"""
+HTTP transport shared by the agent and tools
+Supports live requests plus record/replay against gzip cassette files
+for deterministic offline runs and profiling
+"""
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from .deadline import DeadlineExceeded, check_deadline, remaining_time
+
+MODES = ("live", "record", "replay")
+
+
+class CassetteMiss(Exception):
+    """Raised in replay mode when a request was never recorded"""
+
+
+class TransportResponse:
+    """Minimal response object with the parts of aiohttp's API the pipeline uses"""
+
+    def __init__(self, status: int, body: bytes, headers: Dict[str, str] = None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+def _request_key(method: str, url: str, payload: Any) -> str:
+    """Stable key for a request; headers are excluded so API keys never matter"""
+    canonical = json.dumps([method.upper(), url, payload], sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class HttpTransport:
+    """
+    Routes every HTTP call through one place.
+    - live: plain aiohttp requests
+    - record: live requests, with request, response and latency appended to the cassette as they complete
+    - replay: responses served from the cassette, with recorded or zero latency
+    """
+
+    def __init__(self, mode: str = "live", cassette: Optional[str] = None, replay_latency: bool = True,
+                 default_timeout: Optional[float] = 120):
+        if mode not in MODES:
+            raise ValueError(f"Unknown transport mode: {mode} (expected one of {', '.join(MODES)})")
+        if mode != "live" and not cassette:
+            raise ValueError(f"Transport mode '{mode}' requires a cassette path")
+
+        self.mode = mode
+        self.cassette = cassette
+        self.replay_latency = replay_latency
+        self.default_timeout = default_timeout
+        self._interactions: Dict[str, List[Dict]] = {}
+        self._cursors: Dict[str, int] = {}
+
+        if mode == "replay":
+            self._load()
+        elif mode == "record":
+            # Start a fresh cassette; interactions are appended as they happen
+            directory = os.path.dirname(cassette)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with gzip.open(cassette, "wt", encoding="utf-8"):
+                pass
+
+    @classmethod
+    def from_env(cls) -> "HttpTransport":
+        """Build a transport from HTTP_TRANSPORT_MODE, HTTP_CASSETTE, HTTP_REPLAY_LATENCY and REQUEST_TIMEOUT"""
+        return cls(
+            mode=os.getenv("HTTP_TRANSPORT_MODE", "live"),
+            cassette=os.getenv("HTTP_CASSETTE"),
+            replay_latency=os.getenv("HTTP_REPLAY_LATENCY", "recorded") != "zero",
+            default_timeout=float(os.getenv("REQUEST_TIMEOUT", "120"))
+        )
+
+    async def request(self, method: str, url: str, headers: Dict[str, str] = None,
+                      json: Any = None, timeout: Optional[float] = None) -> TransportResponse:
+        """
+        Perform (or replay) a request and return a fully-read response.
+        The timeout is clamped to the current deadline; DeadlineExceeded is
+        raised if the deadline runs out first.
+        """
+        check_deadline(f"{method.upper()} {url}")
+        limit = timeout if timeout is not None else self.default_timeout
+        left = remaining_time()
+        deadline_bound = left is not None and (limit is None or left <= limit)
+        try:
+            return await asyncio.wait_for(self._perform(method, url, headers, json), left if deadline_bound else limit)
+        except asyncio.TimeoutError:
+            if deadline_bound:
+                raise DeadlineExceeded(f"Deadline exceeded during {method.upper()} {url}") from None
+            raise
+
+    async def _perform(self, method: str, url: str, headers: Optional[Dict[str, str]], json: Any) -> TransportResponse:
+        key = _request_key(method, url, json)
+
+        if self.mode == "replay":
+            return await self._replay(key, method, url)
+
+        started = time.monotonic()
+        async with aiohttp.ClientSession() as session:
+            async with session.request(method, url, headers=headers, json=json) as response:
+                body = await response.read()
+                result = TransportResponse(response.status, body, dict(response.headers))
+        elapsed = time.monotonic() - started
+
+        if self.mode == "record":
+            self._append({
+                "key": key,
+                "method": method.upper(),
+                "url": url,
+                "request": json,
+                "status": result.status,
+                "headers": {k: v for k, v in result.headers.items() if k.lower() == "content-type"},
+                "body": base64.b64encode(body).decode("ascii"),
+                "elapsed": elapsed
+            })
+
+        return result
+
+    async def _replay(self, key: str, method: str, url: str) -> TransportResponse:
+        """Serve recorded interactions for a key in order, repeating the last one"""
+        recorded = self._interactions.get(key)
+        if not recorded:
+            raise CassetteMiss(f"No recorded response for {method.upper()} {url} in {self.cassette}")
+
+        index = self._cursors.get(key, 0)
+        self._cursors[key] = index + 1
+        interaction = recorded[min(index, len(recorded) - 1)]
+
+        if self.replay_latency:
+            await asyncio.sleep(interaction["elapsed"])
+        return TransportResponse(
+            interaction["status"],
+            base64.b64decode(interaction["body"]),
+            interaction.get("headers", {})
+        )
+
+    def rewind(self):
+        """Restart replay from the first recorded response of every request"""
+        self._cursors.clear()
+
+    def _append(self, interaction: Dict[str, Any]):
+        """Append one interaction as its own gzip member, so the cassette is always complete on disk"""
+        with gzip.open(self.cassette, "at", encoding="utf-8") as f:
+            f.write(json.dumps(interaction) + "\n")
+
+    def _load(self):
+        if not os.path.exists(self.cassette):
+            raise FileNotFoundError(f"Cassette not found: {self.cassette}")
+        with gzip.open(self.cassette, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    interaction = json.loads(line)
+                    self._interactions.setdefault(interaction.pop("key"), []).append(interaction)
+
+
+_transport: Optional[HttpTransport] = None
+
+
+def get_transport() -> HttpTransport:
+    """Process-wide transport, configured from the environment on first use"""
+    global _transport
+    if _transport is None:
+        _transport = HttpTransport.from_env()
+    return _transport
+
+
+def set_transport(transport: HttpTransport) -> HttpTransport:
+    """Install a transport explicitly (e.g. a replay transport in a profiling loop)"""
+    global _transport
+    _transport = transport
+    return transport
@@ -0,0 +1,270 @@
+"""
+Event-loop diagnostics
+Samples loop lag and, when the loop is blocked past a threshold, captures the
+loop thread's stack from a watchdog thread to report which functions blocked it.
+One monitor runs per event loop; each run or tool call observes it through a
+session, and stalls are attributed to the session whose task was blocking.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import functools
+import os
+import sys
+import threading
+import time
+import traceback
+import weakref
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_session: contextvars.ContextVar[Optional["MonitorSession"]] = contextvars.ContextVar("loop_monitor_session", default=None)
+_UNKNOWN = object()  # blocking task's session couldn't be determined
+_monitors: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LoopMonitor]" = weakref.WeakKeyDictionary()
+# Session each task was created under (tasks don't expose their context before Python 3.12)
+_task_sessions: "weakref.WeakKeyDictionary[asyncio.Task, MonitorSession]" = weakref.WeakKeyDictionary()
+
+
+def _blocking_frame(stack: traceback.StackSummary) -> traceback.FrameSummary:
+    """Innermost frame in project code, falling back to the innermost frame overall"""
+    for frame in reversed(stack):
+        if frame.filename.startswith(PROJECT_ROOT) and frame.filename != __file__:
+            return frame
+    return stack[-1]
+
+
+class MonitorSession:
+    """Loop lag and blocking calls observed while one run or tool call was active"""
+
+    def __init__(self, name: str, block_threshold: float, parent: Optional["MonitorSession"] = None):
+        self.name = name
+        self.block_threshold = block_threshold
+        self.parent = parent
+        self.samples = 0
+        self.lag_total = 0.0
+        self.lag_max = 0.0
+        self.blocked: Dict[str, Dict[str, Any]] = {}
+        self.started_at = time.monotonic()
+        self.ended_at: Optional[float] = None
+
+    def _add_sample(self, lag: float):
+        self.samples += 1
+        self.lag_total += lag
+        self.lag_max = max(self.lag_max, lag)
+
+    def _add_block(self, location: str, lag: float, stack: Optional[traceback.StackSummary]):
+        entry = self.blocked.setdefault(location, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "stack": []})
+        entry["count"] += 1
+        entry["total_seconds"] += lag
+        entry["max_seconds"] = max(entry["max_seconds"], lag)
+        if stack and not entry["stack"]:
+            entry["stack"] = traceback.format_list(stack)
+
+    def report(self) -> Dict[str, Any]:
+        """Loop lag summary and blocking functions sorted by total time blocked"""
+        blocking: List[Dict[str, Any]] = sorted(
+            ({"function": location, **entry} for location, entry in self.blocked.items()),
+            key=lambda entry: entry["total_seconds"],
+            reverse=True
+        )
+        for entry in blocking:
+            entry["total_seconds"] = round(entry["total_seconds"], 4)
+            entry["max_seconds"] = round(entry["max_seconds"], 4)
+
+        return {
+            "duration_seconds": round((self.ended_at or time.monotonic()) - self.started_at, 3),
+            "samples": self.samples,
+            "mean_lag_seconds": round(self.lag_total / self.samples, 4) if self.samples else 0.0,
+            "max_lag_seconds": round(self.lag_max, 4),
+            "block_threshold_seconds": self.block_threshold,
+            "blocking_calls": blocking
+        }
+
+
+class LoopMonitor:
+    """
+    Cheap enough to leave on: the loop runs one sleep per sample_interval and
+    a watchdog thread checks a heartbeat; stacks are only captured while blocked.
+    Started when the first session on a loop opens and stopped with the last.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, sample_interval: float = 0.05,
+                 block_threshold: float = 0.1, max_stack_depth: int = 30):
+        self.loop = loop
+        self.sample_interval = sample_interval
+        self.block_threshold = block_threshold
+        self.max_stack_depth = max_stack_depth
+
+        self.sessions: List[MonitorSession] = []
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._captured: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        # Tasks only expose their context from Python 3.12; before that, tag them at creation
+        self._previous_factory = loop.get_task_factory()
+        self._tags_tasks = sys.version_info < (3, 12)
+        if self._tags_tasks:
+            loop.set_task_factory(self._task_factory)
+        self._sampler = loop.create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    def _task_factory(self, loop, coro, **kwargs):
+        """Wraps the loop's task factory to remember which session created each task"""
+        if self._previous_factory is not None:
+            task = self._previous_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        session = _session.get()
+        if session is not None:
+            _task_sessions[task] = session
+        return task
+
+    async def _sample(self):
+        """Sleep one interval at a time; any overshoot is loop lag"""
+        while True:
+            await asyncio.sleep(self.sample_interval)
+            self._tick()
+
+    def _tick(self):
+        """Account for the time since the last heartbeat; also called to flush a stall on session exit"""
+        now = time.monotonic()
+        lag = max(0.0, now - self._heartbeat - self.sample_interval)
+        self._heartbeat = now
+
+        for session in self.sessions:
+            session._add_sample(lag)
+
+        if lag >= self.block_threshold:
+            with self._lock:
+                captured, self._captured = self._captured, None
+            self._record_block(lag, captured)
+
+    def _watch(self):
+        """Watchdog thread: grab the loop thread's stack and running task once per stall"""
+        poll = self.block_threshold / 2
+        capturing = False
+        while not self._stopped.wait(poll):
+            stalled = time.monotonic() - self._heartbeat > self.sample_interval + self.block_threshold
+            if stalled and not capturing:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    stack = traceback.extract_stack(frame, limit=self.max_stack_depth)
+                    with self._lock:
+                        self._captured = (stack, self._blocking_session())
+                capturing = True
+            elif not stalled:
+                capturing = False
+
+    def _blocking_session(self) -> Any:
+        """Session of the task running on the loop, or _UNKNOWN if it can't be determined"""
+        task = asyncio.current_task(self.loop)
+        if task is None:
+            return _UNKNOWN
+        get_context = getattr(task, "get_context", None)  # Python 3.12+
+        if get_context is not None:
+            return get_context().get(_session)
+        try:
+            return _task_sessions.get(task)
+        except RuntimeError:
+            # Mapping changed on the loop thread while we read it
+            return _UNKNOWN
+
+    def _record_block(self, lag: float, captured: Optional[tuple]):
+        stack, owner = captured if captured else (None, _UNKNOWN)
+        if stack:
+            frame = _blocking_frame(stack)
+            location = f"{frame.name} ({os.path.relpath(frame.filename, PROJECT_ROOT)}:{frame.lineno})"
+        else:
+            location = "<unknown>"
+
+        if owner is _UNKNOWN:
+            # Owner unknown: every active session saw the stall
+            targets = list(self.sessions)
+        else:
+            targets = []
+            while owner is not None:
+                if owner in self.sessions:
+                    targets.append(owner)
+                owner = owner.parent
+        for session in targets:
+            session._add_block(location, lag, stack)
+
+    def open_session(self, name: str) -> MonitorSession:
+        session = MonitorSession(name, self.block_threshold, parent=_session.get())
+        self.sessions.append(session)
+        task = asyncio.current_task(self.loop)
+        if task is not None:
+            _task_sessions[task] = session
+        return session
+
+    async def close_session(self, session: MonitorSession):
+        # A stall that ended just before exit hasn't been sampled yet
+        self._tick()
+        session.ended_at = time.monotonic()
+        self.sessions.remove(session)
+        task = asyncio.current_task(self.loop)
+        if task is not None:
+            if session.parent is not None:
+                _task_sessions[task] = session.parent
+            else:
+                _task_sessions.pop(task, None)
+        if not self.sessions:
+            # Detach before awaiting, so a session opened meanwhile starts a fresh monitor
+            if _monitors.get(self.loop) is self:
+                del _monitors[self.loop]
+            # Leave alone a task factory someone else installed since
+            if self._tags_tasks and self.loop.get_task_factory() == self._task_factory:
+                self.loop.set_task_factory(self._previous_factory)
+            self._stopped.set()
+            self._sampler.cancel()
+            try:
+                await self._sampler
+            except asyncio.CancelledError:
+                pass
+
+
+@contextlib.asynccontextmanager
+async def monitor_loop(name: str = "run", config: Optional[Dict[str, Any]] = None) -> AsyncIterator[Optional[MonitorSession]]:
+    """
+    Observe the running loop for the duration of the block and yield a session
+    whose report() covers only stalls caused by this block's tasks.
+    config takes enabled, sample_interval and block_threshold; the first
+    session on a loop decides the sampling settings. Yields None if disabled.
+    """
+    config = config or {}
+    if not config.get("enabled", True):
+        yield None
+        return
+
+    loop = asyncio.get_running_loop()
+    monitor = _monitors.get(loop)
+    if monitor is None:
+        monitor = _monitors[loop] = LoopMonitor(
+            loop,
+            sample_interval=config.get("sample_interval", 0.05),
+            block_threshold=config.get("block_threshold", 0.1)
+        )
+    session = monitor.open_session(name)
+    token = _session.set(session)
+    try:
+        yield session
+    finally:
+        _session.reset(token)
+        await monitor.close_session(session)
+
+
+def monitored(func):
+    """Decorator for async tool entry points: report any loop blocking caused by the call"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        async with monitor_loop(func.__name__) as session:
+            result = await func(*args, **kwargs)
+        for entry in session.report()["blocking_calls"][:3] if session else []:
+            print(f"🐢 {func.__name__} blocked the loop in {entry['function']}: "
+                  f"{entry['count']}x, {entry['total_seconds']}s total, {entry['max_seconds']}s max")
+        return result
+    return wrapper
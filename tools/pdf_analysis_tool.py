@@ -3,8 +3,10 @@ from PyPDF2 import PdfReader
 import aiofiles
 import os
 from typing import Dict, Any
+from .loop_monitor import monitored
 
 @tool("analyze_product_pdf", description="Analyze product PDFs for specifications and features")
+@monitored
 async def analyze_product_pdf(file_path: str) -> Dict[str, Any]:
     """
     Analyze product PDF documents to extract specifications and features
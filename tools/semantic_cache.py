@@ -0,0 +1,174 @@
+"""
+Local semantic cache for LLM prompts
+Near-duplicate prompts (e.g. "CRM software" vs "CRM tools", or a page that
+changed by one line) are matched with a hashed bag-of-ngrams vectoriser and a
+cosine-similarity index per stage, entirely offline
+"""
+
+import math
+import random
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9$€£%.]+")
+
+
+class HashingVectorizer:
+    """Signed feature hashing of word unigrams and bigrams, L2-normalised"""
+
+    def __init__(self, dimensions: int = 4096):
+        self.dimensions = dimensions
+
+    def transform(self, text: str) -> np.ndarray:
+        tokens = _TOKEN.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+        counts: Dict[int, float] = {}
+        for feature in features:
+            # crc32 is stable across processes, unlike hash()
+            h = zlib.crc32(feature.encode())
+            index = h % self.dimensions
+            counts[index] = counts.get(index, 0.0) + (1.0 if h & 0x80000000 else -1.0)
+
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for index, value in counts.items():
+            # Sublinear term frequency so repeated boilerplate doesn't dominate
+            vector[index] = math.copysign(math.log1p(abs(value)), value)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class _StageIndex:
+    """Ring of normalised vectors, grown on demand up to capacity, searched with one matrix product"""
+
+    def __init__(self, dimensions: int, capacity: int):
+        self.capacity = capacity
+        self.vectors = np.zeros((min(64, capacity), dimensions), dtype=np.float32)
+        self.answers: List[str] = []
+        self.next = 0
+
+    def nearest(self, vector: np.ndarray) -> Tuple[int, float]:
+        if not self.answers:
+            return -1, 0.0
+        similarities = self.vectors[:len(self.answers)] @ vector
+        index = int(np.argmax(similarities))
+        return index, float(similarities[index])
+
+    def add(self, vector: np.ndarray, answer: str):
+        if len(self.answers) < self.capacity:
+            if len(self.answers) == len(self.vectors):
+                grown = np.zeros((min(2 * len(self.vectors), self.capacity), self.vectors.shape[1]), dtype=np.float32)
+                grown[:len(self.vectors)] = self.vectors
+                self.vectors = grown
+            self.answers.append(answer)
+        else:
+            self.answers[self.next] = answer
+        self.vectors[self.next] = vector
+        self.next = (self.next + 1) % self.capacity
+
+
+class SemanticCache:
+    """
+    Per-stage similarity cache with hit-quality metrics.
+    A fraction of hits (audit_rate) is re-asked anyway and the fresh answer
+    compared with the cached one, so thresholds can be tuned against real agreement.
+    """
+
+    def __init__(self, thresholds: Dict[str, float], dimensions: int = 4096,
+                 max_entries: int = 5000, audit_rate: float = 0.0, near_miss_margin: float = 0.05):
+        self.thresholds = thresholds
+        self.vectorizer = HashingVectorizer(dimensions)
+        self.max_entries = max_entries
+        self.audit_rate = audit_rate
+        self.near_miss_margin = near_miss_margin
+        self._indexes: Dict[str, _StageIndex] = {}
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+        self._random = random.Random(0)
+
+    @classmethod
+    def from_profile(cls, profile: Dict[str, Any]) -> Optional["SemanticCache"]:
+        """Build the cache from performance.semantic_cache, None if disabled"""
+        config = profile.get("performance", {}).get("semantic_cache", {})
+        if not config.get("enabled", False):
+            return None
+        return cls(
+            thresholds=config.get("thresholds", {}),
+            dimensions=config.get("dimensions", 4096),
+            max_entries=config.get("max_entries", 5000),
+            audit_rate=config.get("audit_rate", 0.0)
+        )
+
+    def _threshold(self, stage: str) -> Optional[float]:
+        """Threshold for a stage; "extraction.pricing" falls back to "extraction" but keeps its own index"""
+        return self.thresholds.get(stage, self.thresholds.get(stage.split(".")[0]))
+
+    def _stage_metrics(self, stage: str) -> Dict[str, Any]:
+        return self._metrics.setdefault(stage, {
+            "lookups": 0, "hits": 0, "near_misses": 0,
+            "hit_similarity_total": 0.0, "min_hit_similarity": None,
+            "audits": 0, "audit_agreement_total": 0.0
+        })
+
+    def lookup(self, stage: str, prompt: str) -> Tuple[Optional[str], float, bool]:
+        """
+        Return (answer, similarity, audit). answer is None on a miss; audit means
+        the caller should still query the LLM and report back via record_audit.
+        """
+        threshold = self._threshold(stage)
+        if threshold is None:
+            return None, 0.0, False
+
+        metrics = self._stage_metrics(stage)
+        metrics["lookups"] += 1
+        index = self._indexes.get(stage)
+        if index is None:
+            return None, 0.0, False
+
+        position, similarity = index.nearest(self.vectorizer.transform(prompt))
+
+        if similarity < threshold:
+            if similarity >= threshold - self.near_miss_margin:
+                metrics["near_misses"] += 1
+            return None, similarity, False
+
+        metrics["hits"] += 1
+        metrics["hit_similarity_total"] += similarity
+        if metrics["min_hit_similarity"] is None or similarity < metrics["min_hit_similarity"]:
+            metrics["min_hit_similarity"] = similarity
+        return index.answers[position], similarity, self._random.random() < self.audit_rate
+
+    def store(self, stage: str, prompt: str, answer: str):
+        if self._threshold(stage) is None:
+            return
+        if stage not in self._indexes:
+            self._indexes[stage] = _StageIndex(self.vectorizer.dimensions, self.max_entries)
+        self._indexes[stage].add(self.vectorizer.transform(prompt), answer)
+
+    def record_audit(self, stage: str, cached_answer: str, fresh_answer: str) -> float:
+        """Compare a cached answer with a fresh one for the same prompt"""
+        agreement = float(self.vectorizer.transform(cached_answer) @ self.vectorizer.transform(fresh_answer))
+        metrics = self._stage_metrics(stage)
+        metrics["audits"] += 1
+        metrics["audit_agreement_total"] += agreement
+        return agreement
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit rate, similarity of accepted hits, near misses and audit agreement per stage"""
+        report = {}
+        for stage, metrics in self._metrics.items():
+            hits, lookups, audits = metrics["hits"], metrics["lookups"], metrics["audits"]
+            report[stage] = {
+                "threshold": self._threshold(stage),
+                "lookups": lookups,
+                "hits": hits,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "mean_hit_similarity": round(metrics["hit_similarity_total"] / hits, 4) if hits else None,
+                "min_hit_similarity": round(metrics["min_hit_similarity"], 4) if hits else None,
+                "near_misses": metrics["near_misses"],
+                "audits": audits,
+                "mean_audit_agreement": round(metrics["audit_agreement_total"] / audits, 4) if audits else None
+            }
+        return report